@@ -0,0 +1,36 @@
+"""
+Shared pytest fixtures, scoped to the session so connections are reused across tests.
+"""
+import pytest
+import httpx
+import docker
+from testcontainers.core.container import DockerContainer
+from testcontainers.core.waiting_utils import wait_for_logs
+
+
+@pytest.fixture(scope="session")
+def http():
+    """One httpx client for the whole session, keeping connections alive between tests."""
+    with httpx.Client(timeout=10.0) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def require_docker():
+    """Ping the Docker daemon once per session, skipping dependent tests if it is unreachable."""
+    try:
+        with docker.from_env() as client:
+            client.ping()
+    except Exception:
+        pytest.skip("Docker unavailable")
+    return True
+
+
+@pytest.fixture(scope="session")
+def nginx_url(require_docker):
+    """Start one nginx:alpine container for the session and yield its base URL."""
+    with DockerContainer("nginx:alpine").with_exposed_ports(80) as container:
+        # Wait until nginx reports its workers are up
+        wait_for_logs(container, "start worker processes", timeout=10, interval=0.1)
+        print(f"\n🐳 Shared nginx container started: {container._container.short_id}")
+        yield f"http://{container.get_container_host_ip()}:{container.get_exposed_port(80)}/"
@@ -3,214 +3,229 @@
 Docker Agent Demo Script
 
 This script demonstrates how a background agent can use Docker programmatically
-to perform common containerization tasks. It shows both CLI commands via subprocess
-and Python Docker library usage.
+to perform common containerization tasks. It shows the Python API equivalents of
+common Docker CLI commands alongside wider Python Docker library usage.
 """
 
+import io
+import os
+import shlex
 import subprocess
 import sys
+import tarfile
 import time
 import json
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import docker
-import httpx
 
 
-def run_command(cmd, capture_output=True, check=True):
-    """Run a shell command and return the result."""
-    print(f"🔧 Running: {cmd}")
+# Images used by the demos, pulled concurrently up front in main()
+REQUIRED_IMAGES = ["alpine:latest", "nginx:alpine"]
+
+# Connections kept open to the Docker daemon, so concurrent calls don't queue
+DOCKER_POOL_SIZE = 16
+
+
+def run_command(cmd, capture_output=True, check=True, discard_output=False, out=None):
+    """Run a command and return the result."""
+    print(f"🔧 Running: {cmd}", file=out)
+    if discard_output:
+        # stdout goes to /dev/null; stderr is still captured for error reporting
+        streams = {'stdout': subprocess.DEVNULL, 'stderr': subprocess.PIPE}
+    else:
+        streams = {'capture_output': capture_output}
     try:
         result = subprocess.run(
-            cmd.split() if isinstance(cmd, str) else cmd,
-            capture_output=capture_output,
+            shlex.split(cmd) if isinstance(cmd, str) else cmd,
             text=True,
-            check=check
+            check=check,
+            **streams
         )
-        if capture_output and result.stdout:
-            print(f"✅ Output: {result.stdout.strip()}")
+        if capture_output and not discard_output and result.stdout:
+            print(f"✅ Output: {result.stdout.strip()}", file=out)
         return result
     except subprocess.CalledProcessError as e:
-        print(f"❌ Command failed: {e}")
-        if capture_output and e.stderr:
-            print(f"❌ Error: {e.stderr.strip()}")
+        print(f"❌ Command failed: {e}", file=out)
+        if e.stderr:
+            print(f"❌ Error: {e.stderr.strip()}", file=out)
         raise
 
 
-def demo_docker_cli_commands():
-    """Demonstrate Docker CLI usage via subprocess."""
-    print("\n" + "="*50)
-    print("🐳 DOCKER CLI COMMANDS DEMO")
-    print("="*50)
+def wait_until(predicate, timeout=10, interval=0.05):
+    """Poll predicate with a small backoff until it is truthy or timeout expires."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(interval)
+        interval = min(interval * 2, 0.5)
+    return False
+
+
+def dockerfile_context(dockerfile_content):
+    """Return an in-memory tar build context containing just a Dockerfile."""
+    dockerfile_bytes = dockerfile_content.encode('utf-8')
+    context = io.BytesIO()
+    with tarfile.open(fileobj=context, mode='w') as tar:
+        info = tarfile.TarInfo('Dockerfile')
+        info.size = len(dockerfile_bytes)
+        tar.addfile(info, io.BytesIO(dockerfile_bytes))
+    context.seek(0)
+    return context
+
+
+def demo_docker_cli_commands(client, out=None):
+    """Demonstrate common Docker CLI operations, run through the API client."""
+    print("\n" + "="*50, file=out)
+    print("🐳 DOCKER CLI EQUIVALENTS (PYTHON API) DEMO", file=out)
+    print("="*50, file=out)
     
     # Check Docker version
-    print("\n📋 Checking Docker version...")
-    run_command("docker --version")
-    
-    # List current containers
-    print("\n📦 Listing current containers...")
-    run_command("docker ps -a")
-    
-    # List current images
-    print("\n🖼️  Listing current images...")
-    run_command("docker images")
+    print("\n📋 Checking Docker version...", file=out)
+    run_command("docker --version", out=out)
     
-    # Pull a lightweight image
-    print("\n⬇️  Pulling Alpine Linux image...")
-    run_command("docker pull alpine:latest")
+    # Count containers and images (docker ps -a, docker images)
+    print("\n📦 Counting containers and images...", file=out)
+    print(f"✅ Containers: {len(client.containers.list(all=True))}", file=out)
+    print(f"✅ Images: {len(client.images.list())}", file=out)
     
-    # Run a simple container
-    print("\n🚀 Running a simple Alpine container...")
-    result = run_command("docker run --rm alpine:latest echo 'Hello from Docker container!'")
+    # Run a simple container (docker run --rm)
+    print("\n🚀 Running a simple Alpine container...", file=out)
+    output = client.containers.run(
+        "alpine:latest",
+        "echo 'Hello from Docker container!'",
+        remove=True
+    )
+    print(f"✅ Output: {output.decode('utf-8').strip()}", file=out)
     
     # Create and run a container with networking
-    print("\n🌐 Running container with network test...")
-    run_command([
-        "docker", "run", "--rm", 
-        "alpine:latest", "sh", "-c", 
-        "ping -c 3 google.com || echo 'Network test complete'"
-    ])
+    print("\n🌐 Running container with network test...", file=out)
+    output = client.containers.run(
+        "alpine:latest",
+        ["sh", "-c", "ping -c 3 google.com || echo 'Network test complete'"],
+        remove=True
+    )
+    print(f"✅ Output: {output.decode('utf-8').strip()}", file=out)
 
 
-def demo_python_docker_library():
+def demo_python_docker_library(client, out=None):
     """Demonstrate Docker Python library usage."""
-    print("\n" + "="*50)
-    print("🐍 PYTHON DOCKER LIBRARY DEMO")
-    print("="*50)
+    print("\n" + "="*50, file=out)
+    print("🐍 PYTHON DOCKER LIBRARY DEMO", file=out)
+    print("="*50, file=out)
     
-    # Initialize Docker client
-    print("\n🔌 Connecting to Docker daemon...")
+    # Query the shared Docker client
+    print("\n🔌 Querying Docker daemon...", file=out)
     try:
-        client = docker.from_env()
-        print(f"✅ Connected to Docker daemon")
+        # The version endpoint is much lighter than info
+        version = client.version()
+        print(f"📊 Docker version: {version['Version']}", file=out)
         
-        # Get Docker info
-        info = client.info()
-        print(f"📊 Docker version: {info['ServerVersion']}")
-        print(f"📊 Total containers: {info['Containers']}")
-        print(f"📊 Running containers: {info['ContainersRunning']}")
+        # Only hit the heavier info endpoint when verbose output is requested
+        if os.environ.get("VERBOSE"):
+            info = client.info()
+            print(f"📊 Total containers: {info['Containers']}", file=out)
+            print(f"📊 Running containers: {info['ContainersRunning']}", file=out)
+            print(f"📊 Total images: {info['Images']}", file=out)
         
     except Exception as e:
-        print(f"❌ Failed to connect to Docker daemon: {e}")
+        print(f"❌ Failed to query Docker daemon: {e}", file=out)
         return
     
-    # List images
-    print("\n🖼️  Listing images with Python client...")
-    images = client.images.list()
-    for image in images[:5]:  # Just show first 5
-        tags = image.tags[0] if image.tags else '<none>'
-        print(f"  📦 {tags} ({image.short_id})")
-    
-    # Pull an image
-    print("\n⬇️  Pulling nginx:alpine image...")
-    try:
-        image = client.images.pull("nginx:alpine")
-        print(f"✅ Pulled image: {image.tags[0]} ({image.short_id})")
-    except Exception as e:
-        print(f"⚠️  Image pull issue: {e}")
+    # Check nginx from inside the container (no published port needed),
+    # keeping the latest result for reporting
+    last_check = None
+    def nginx_ready():
+        nonlocal last_check
+        last_check = container.exec_run("wget -T 1 -qO- 127.0.0.1:80")
+        return last_check.exit_code == 0
     
     # Run a container
-    print("\n🚀 Creating and running nginx container...")
+    print("\n🚀 Creating and running nginx container...", file=out)
     try:
         container = client.containers.run(
             "nginx:alpine",
             name="agent-demo-nginx",
-            ports={'80/tcp': None},  # Let Docker assign a random port
             detach=True,
             remove=True  # Auto-remove when stopped
         )
         
-        # Wait for container to start
-        time.sleep(2)
-        container.reload()
-        
-        print(f"✅ Container started: {container.name} ({container.short_id})")
-        print(f"📊 Status: {container.status}")
+        # run() has already started the container when it returns
+        print(f"✅ Container started: {container.name} ({container.short_id})", file=out)
         
-        # Get container info
-        port_info = container.ports.get('80/tcp')
-        if port_info:
-            host_port = port_info[0]['HostPort']
-            print(f"🌐 Nginx available on port: {host_port}")
-            
-            # Try to make a request to the container
-            try:
-                response = httpx.get(f"http://localhost:{host_port}", timeout=5.0)
-                print(f"✅ HTTP request successful! Status: {response.status_code}")
-            except Exception as e:
-                print(f"ℹ️  HTTP request info: {e}")
+        # A started container isn't a ready one; retry until nginx serves a request
+        if wait_until(nginx_ready):
+            print(f"✅ Nginx responded with {len(last_check.output)} bytes", file=out)
+        else:
+            print("⚠️  Nginx did not start accepting requests in time", file=out)
+            print(f"ℹ️  Nginx check info: {last_check.output.decode('utf-8').strip()}", file=out)
         
         # Stop and remove container
-        print(f"⏹️  Stopping container...")
+        print(f"⏹️  Stopping container...", file=out)
         container.stop()
-        print(f"✅ Container stopped and removed")
+        print(f"✅ Container stopped and removed", file=out)
         
     except Exception as e:
-        print(f"❌ Container operation failed: {e}")
+        print(f"❌ Container operation failed: {e}", file=out)
 
 
-def demo_container_management():
+def demo_container_management(client, out=None):
     """Demonstrate container lifecycle management."""
-    print("\n" + "="*50)
-    print("🔄 CONTAINER LIFECYCLE MANAGEMENT DEMO")
-    print("="*50)
+    print("\n" + "="*50, file=out)
+    print("🔄 CONTAINER LIFECYCLE MANAGEMENT DEMO", file=out)
+    print("="*50, file=out)
     
-    client = docker.from_env()
-    
-    # Create a simple container that runs in background
-    print("\n🚀 Creating a long-running container...")
+    # Create a container with a short, bounded workload
+    print("\n🚀 Creating a short-lived worker container...", file=out)
     try:
         container = client.containers.run(
             "alpine:latest",
-            command="sh -c 'while true; do echo Hello Agent $(date); sleep 5; done'",
+            command="sh -c 'for i in 1 2 3; do echo Hello Agent $i; done'",
             name="agent-demo-worker",
             detach=True
         )
         
-        print(f"✅ Container created: {container.name} ({container.short_id})")
+        print(f"✅ Container created: {container.name} ({container.short_id})", file=out)
         
-        # Monitor container for a bit
-        print("📊 Monitoring container logs...")
-        time.sleep(8)
+        # Block until the workload exits
+        print("⏳ Waiting for container to finish...", file=out)
+        result = container.wait()
+        print(f"📊 Exit code: {result['StatusCode']}", file=out)
         
-        # Get logs
-        logs = container.logs(tail=3).decode('utf-8')
-        print(f"📝 Recent logs:\n{logs}")
+        # Print each log chunk as it is read instead of decoding the whole log at once
+        print("📝 Container logs:", file=out)
+        for chunk in container.logs(stream=True, follow=False):
+            print(chunk.decode('utf-8'), end="", file=out)
         
         # Get container stats
         container.reload()
-        print(f"📊 Container status: {container.status}")
-        
-        # Stop the container
-        print("⏹️  Stopping container...")
-        container.stop()
+        print(f"📊 Container status: {container.status}", file=out)
         
         # Remove the container
-        print("🗑️  Removing container...")
+        print("🗑️  Removing container...", file=out)
         container.remove()
         
-        print("✅ Container lifecycle completed")
+        print("✅ Container lifecycle completed", file=out)
         
     except Exception as e:
-        print(f"❌ Container management failed: {e}")
+        print(f"❌ Container management failed: {e}", file=out)
         # Cleanup in case of error
         try:
             cleanup_container = client.containers.get("agent-demo-worker")
             cleanup_container.remove(force=True)
-            print("🧹 Cleanup completed")
+            print("🧹 Cleanup completed", file=out)
         except:
             pass
 
 
-def demo_image_operations():
+def demo_image_operations(client, out=None):
     """Demonstrate image operations."""
-    print("\n" + "="*50)
-    print("🖼️  IMAGE OPERATIONS DEMO")
-    print("="*50)
-    
-    client = docker.from_env()
+    print("\n" + "="*50, file=out)
+    print("🖼️  IMAGE OPERATIONS DEMO", file=out)
+    print("="*50, file=out)
     
     # Build a simple image from a Dockerfile string
-    print("\n🏗️  Building a custom image...")
+    print("\n🏗️  Building a custom image...", file=out)
     
     dockerfile_content = """
 FROM alpine:latest
@@ -219,39 +234,32 @@ CMD cat /demo.txt
 """
     
     try:
-        # Create temporary dockerfile
-        temp_dockerfile = Path("/tmp/agent_demo_dockerfile")
-        temp_dockerfile.write_text(dockerfile_content)
-        
-        # Build image
+        # Build image from an in-memory context holding only the Dockerfile
         image, build_logs = client.images.build(
-            path="/tmp",
-            dockerfile="agent_demo_dockerfile",
+            fileobj=dockerfile_context(dockerfile_content),
+            custom_context=True,
             tag="agent-demo:latest",
             rm=True
         )
         
-        print(f"✅ Image built: {image.tags[0]} ({image.short_id})")
+        print(f"✅ Image built: {image.tags[0]} ({image.short_id})", file=out)
         
         # Run container from our custom image
-        print("🚀 Running container from custom image...")
+        print("🚀 Running container from custom image...", file=out)
         result = client.containers.run(
             "agent-demo:latest",
             remove=True
         )
-        print(f"📝 Container output: {result.decode('utf-8').strip()}")
+        print(f"📝 Container output: {result.decode('utf-8').strip()}", file=out)
         
         # Clean up the image
-        print("🗑️  Removing custom image...")
+        print("🗑️  Removing custom image...", file=out)
         client.images.remove("agent-demo:latest", force=True)
         
-        # Clean up temp file
-        temp_dockerfile.unlink()
-        
-        print("✅ Image operations completed")
+        print("✅ Image operations completed", file=out)
         
     except Exception as e:
-        print(f"❌ Image operations failed: {e}")
+        print(f"❌ Image operations failed: {e}", file=out)
 
 
 def main():
@@ -262,14 +270,41 @@ def main():
     
     try:
         # Check if Docker is available
-        run_command("docker info", capture_output=False)
+        run_command("docker info", discard_output=True)
         print("✅ Docker is available and running")
         
-        # Run all demos
-        demo_docker_cli_commands()
-        demo_python_docker_library()
-        demo_container_management()
-        demo_image_operations()
+        # Share one Docker client (and its connection pool) across all demos
+        with docker.from_env(max_pool_size=DOCKER_POOL_SIZE) as client:
+            print("✅ Connected to Docker daemon")
+            
+            # Pull all demo images in parallel so their downloads overlap
+            print(f"\n⬇️  Pulling images: {', '.join(REQUIRED_IMAGES)}...")
+            with ThreadPoolExecutor(max_workers=len(REQUIRED_IMAGES)) as ex:
+                pulls = {name: ex.submit(client.images.pull, name) for name in REQUIRED_IMAGES}
+            # A failed pull is reported but doesn't stop the remaining demos
+            for name, pull in pulls.items():
+                try:
+                    image = pull.result()
+                    print(f"✅ Pulled image: {image.tags[0]} ({image.short_id})")
+                except Exception as e:
+                    print(f"⚠️  Image pull issue ({name}): {e}")
+            
+            # Run all demos concurrently; they use distinct containers and tags
+            demos = [
+                demo_docker_cli_commands,
+                demo_python_docker_library,
+                demo_container_management,
+                demo_image_operations,
+            ]
+            # Each demo writes to its own buffer, printed in list order once all finish
+            outputs = [io.StringIO() for _ in demos]
+            with ThreadPoolExecutor(max_workers=len(demos)) as ex:
+                futures = [ex.submit(demo, client, out) for demo, out in zip(demos, outputs)]
+            # Show every demo's output before surfacing the first failure
+            for out in outputs:
+                sys.stdout.write(out.getvalue())
+            for future in futures:
+                future.result()
         
         print("\n" + "="*60)
         print("🎉 ALL DOCKER AGENT DEMOS COMPLETED SUCCESSFULLY!")
@@ -5,18 +5,16 @@ Streamlined tests demonstrating:
 """
 import pytest
 import httpx
-import time
-from testcontainers.core.container import DockerContainer
 
 
-def test_external_network_call():
+def test_external_network_call(http):
     """Test external API call - fast and simple."""
     
     print("\n🚀 Making external network call...")
     
     # Use a simple, fast endpoint
     try:
-        response = httpx.get("https://httpbin.org/uuid", timeout=10.0)
+        response = http.get("https://httpbin.org/uuid")
         assert response.status_code == 200
         assert "uuid" in response.json()
         print(f"✅ External call successful! Status: {response.status_code}")
@@ -26,44 +24,19 @@ def test_external_network_call():
         print("✅ Test passed (external network attempted)")
 
 
-def test_testcontainers_network_call():
-    """Test testcontainers with network call - demonstrates testcontainers functionality."""
+def test_testcontainers_network_call(http, nginx_url):
+    """Test network call to the nginx container that the nginx_url fixture starts with testcontainers."""
     
-    print("\n🔧 Starting nginx container with testcontainers...")
+    # nginx:alpine is started once per session by the nginx_url fixture
+    print(f"\n🌐 Making network call to nginx at: {nginx_url}")
     
-    # Use nginx:alpine - smallest, fastest web server  
-    with DockerContainer("nginx:alpine") as container:
-        container.with_exposed_ports(80)
-        
-        # Give nginx a moment to start
-        time.sleep(1)
-        
-        print(f"🐳 Container started: {container._container.short_id}")
-        print(f"📋 Image: {container.image}")
-        print(f"✅ Testcontainers successfully created and started container!")
-        
-        # In Docker-in-Docker scenarios, networking can be complex
-        # Try to make a network call if possible
-        try:
-            # Try to get container IP and make a call
-            container_ip = container._container.attrs['NetworkSettings']['IPAddress']
-            if container_ip:
-                url = f"http://{container_ip}:80/"
-                print(f"🌐 Attempting network call to: {url}")
-                response = httpx.get(url, timeout=3.0)
-                assert response.status_code == 200
-                print(f"✅ Network call successful! Status: {response.status_code}")
-            else:
-                print(f"ℹ️  Container running in Docker-in-Docker mode (no direct IP)")
-                print(f"✅ Testcontainers functionality verified!")
-        except Exception as e:
-            print(f"ℹ️  Network call not possible in this setup: {type(e).__name__}")
-            print(f"✅ Testcontainers functionality verified!")
-        
-        # Verify container is actually running
-        container._container.reload()
-        assert container._container.status == "running"
-        print(f"📦 Full testcontainers lifecycle demonstrated!")
+    # In Docker-in-Docker scenarios, networking can be complex
+    try:
+        response = http.get(nginx_url, timeout=3.0)
+        assert response.status_code == 200
+        print(f"✅ Network call successful! Status: {response.status_code}")
+    except httpx.TransportError as e:
+        pytest.skip(f"Network call to nginx not possible in this setup: {type(e).__name__}")
 
 
 if __name__ == "__main__":